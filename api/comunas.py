@@ -1,53 +1,47 @@
 import fastapi
 from fastapi import Depends, Form, UploadFile, File
-from database.database import Session
+from database.database import Session, get_db, get_repositorio, get_repositorio_escritura
 from database.models import ComunaTabla
+from database.repositorio import RepositorioCatalogo
 from models.response.default import DefaultResponse
-from api.regiones import nombre_de_comuna_es_repetido, buscar_region, imagen_por_defecto, eliminar_imagen, \
-    url_imagen_comuna, validar_imagen_comuna
+from api.regiones import imagen_por_defecto, eliminar_imagen, url_imagen_comuna, validar_imagen_comuna
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import FileResponse
 import os.path
 
 router = fastapi.APIRouter()
 
 
-def get_db():
-    db = Session()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get(
     path="/comuna/{id_comuna}",
     name="Obtener comuna",
     description="Obtiene una comuna por su id")
-def get_comuna(id_comuna: int, db: Session = Depends(get_db)):
+def get_comuna(id_comuna: int, repositorio: RepositorioCatalogo = Depends(get_repositorio)):
     response: DefaultResponse = DefaultResponse()
-    comuna = buscar_comuna(id_comuna, db)
+    comuna = repositorio.buscar_comuna(id_comuna)
 
     if comuna is None:
         return respuesta_comuna_no_encontrada(response)
     else:
-        region = buscar_region(comuna.idregion, db)
-        comuna.region = region.nombre
-        return {"mensaje": "Comuna obtenida", "comuna": comuna}
+        region = repositorio.buscar_region(comuna.idregion)
+        return {"mensaje": "Comuna obtenida", "comuna": {**jsonable_encoder(comuna), "region": region.nombre}}
 
 
 @router.get(
     path="/comuna/{id_comuna}/imagen",
     name="Obtener imagen de comuna",
     description="Obtiene el archivo imagen de la comuna")
-def get_comuna_imagen(id_comuna: int, db: Session = Depends(get_db)):
-    comuna = buscar_comuna(id_comuna, db)
+def get_comuna_imagen(id_comuna: int, repositorio: RepositorioCatalogo = Depends(get_repositorio),
+                      repositorio_escritura: RepositorioCatalogo = Depends(get_repositorio_escritura),
+                      db_escritura: Session = Depends(get_db)):
+    comuna = repositorio.buscar_comuna(id_comuna)
 
     if comuna is not None and comuna.url is not None:
         imagen_url = url_imagen_comuna(id_comuna, comuna.url)
         if os.path.exists(imagen_url):
             return FileResponse(imagen_url, media_type="image/png")
-        else:
-            eliminar_url_comuna(comuna, db)
+        elif not repositorio.solo_lectura:
+            eliminar_url_comuna(id_comuna, repositorio_escritura, db_escritura)
 
     return imagen_por_defecto()
 
@@ -58,11 +52,11 @@ def get_comuna_imagen(id_comuna: int, db: Session = Depends(get_db)):
     description="Guarda una comuna a través de un formulario")
 def save_comuna(idcomuna: int | None = Form(None), idregion: int = Form(...), nombre: str = Form(...),
                 active: int | None = Form(None), imagen: UploadFile | None = File(None),
-                db: Session = Depends(get_db)):
+                db: Session = Depends(get_db), repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
     comuna_a_guardar = ComunaTabla()
 
-    if nombre_de_comuna_es_repetido(nombre, db):
+    if repositorio.nombre_de_comuna_es_repetido(nombre):
         return respuesta_comuna_registrada(response)
     guardar_comuna(comuna_a_guardar, db, idcomuna, idregion, nombre, active, imagen)
 
@@ -76,15 +70,16 @@ def save_comuna(idcomuna: int | None = Form(None), idregion: int = Form(...), no
     description="Actualiza una comuna a través de un formulario")
 def put_comuna(id_comuna_path: int, idcomuna: int | None = Form(None), idregion: int | None = Form(None),
                nombre: str | None = Form(None), active: int | None = Form(None),
-               imagen: UploadFile | None = File(None), db: Session = Depends(get_db)):
+               imagen: UploadFile | None = File(None), db: Session = Depends(get_db),
+               repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
-    registro_a_actualizar = buscar_comuna(id_comuna_path, db)
+    registro_a_actualizar = repositorio.buscar_comuna(id_comuna_path)
 
     if registro_a_actualizar is None:
         return respuesta_comuna_no_encontrada(response)
     else:
         if nombre is not None:
-            if nombre_de_comuna_es_repetido(nombre, db):
+            if repositorio.nombre_de_comuna_es_repetido(nombre):
                 return respuesta_comuna_registrada(response)
         guardar_comuna(registro_a_actualizar, db, idcomuna, idregion, nombre, active, imagen)
 
@@ -96,9 +91,10 @@ def put_comuna(id_comuna_path: int, idcomuna: int | None = Form(None), idregion:
     path="/comuna/{id_comuna}",
     name="Eliminar comuna",
     description="Elimina una comuna por su id")
-def delete_comuna(id_comuna: int, db: Session = Depends(get_db)):
+def delete_comuna(id_comuna: int, db: Session = Depends(get_db),
+                  repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
-    registro_a_eliminar = buscar_comuna(id_comuna, db)
+    registro_a_eliminar = repositorio.buscar_comuna(id_comuna)
 
     if registro_a_eliminar is None:
         return respuesta_comuna_no_encontrada(response)
@@ -125,14 +121,11 @@ def respuesta_comuna_registrada(response: DefaultResponse):
     return response
 
 
-def buscar_comuna(id_comuna: int, db: Session):
-    return db.query(ComunaTabla).filter(ComunaTabla.idcomuna == id_comuna).first()
-
-
-def eliminar_url_comuna(comuna: ComunaTabla, db: Session):
-    comuna.url = None
-    db.add(comuna)
-    db.commit()
+def eliminar_url_comuna(id_comuna: int, repositorio: RepositorioCatalogo, db: Session):
+    comuna = repositorio.buscar_comuna(id_comuna)
+    if comuna is not None:
+        comuna.url = None
+        db.commit()
 
 
 def eliminar_comuna(comuna: ComunaTabla, db: Session):
@@ -1,6 +1,7 @@
 import fastapi
 from fastapi import Depends, Form, UploadFile, File
-from database.database import Session
+from database.database import Session, get_db, get_repositorio, get_repositorio_escritura
+from database.repositorio import RepositorioCatalogo
 from database.models import RegionTabla
 from database.models import ComunaTabla
 from models.request.region import RegionComunasResponse
@@ -16,21 +17,13 @@ from pathlib import Path
 router = fastapi.APIRouter()
 
 
-def get_db():
-    db = Session()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get(
     path="/region/{id_region}",
     name="Obtener región",
     description="Obtiene una región por su id")
-def get_region(id_region: int, db: Session = Depends(get_db)):
+def get_region(id_region: int, repositorio: RepositorioCatalogo = Depends(get_repositorio)):
     response: DefaultResponse = DefaultResponse()
-    region = buscar_region(id_region, db)
+    region = repositorio.buscar_region(id_region)
 
     if region is None:
         return respuesta_region_no_encontrada(response)
@@ -42,31 +35,34 @@ def get_region(id_region: int, db: Session = Depends(get_db)):
     path="/region/{id_region}/comuna",
     name="Obtener región y sus comunas",
     description="Obtiene una región por su id, junto con sus comunas")
-def get_region_comunas(id_region: int, limit: int = 1000, offset: int = 0, db: Session = Depends(get_db)):
+def get_region_comunas(id_region: int, limit: int = 1000, offset: int = 0,
+                       repositorio: RepositorioCatalogo = Depends(get_repositorio)):
     response: DefaultResponse = DefaultResponse()
-    region = buscar_region(id_region, db)
+    region = repositorio.buscar_region(id_region)
 
     if region is None:
         return respuesta_region_no_encontrada(response)
     else:
-        comunas = buscar_comunas_de_region(id_region, db, limit, offset)
+        comunas = repositorio.buscar_comunas_de_region(id_region, limit, offset)
         return {"mensaje": "Región y comunas obtenidas", "region": region, "comunas": comunas,
-                "total": count_comunas_de_region(id_region, db), "limit": limit, "offset": offset}
+                "total": repositorio.count_comunas_de_region(id_region), "limit": limit, "offset": offset}
 
 
 @router.get(
     path="/region/{id_region}/imagen",
     name="Obtener imagen de región",
     description="Obtiene el archivo imagen de la región")
-def get_region_imagen(id_region: int, db: Session = Depends(get_db)):
-    region = buscar_region(id_region, db)
+def get_region_imagen(id_region: int, repositorio: RepositorioCatalogo = Depends(get_repositorio),
+                      repositorio_escritura: RepositorioCatalogo = Depends(get_repositorio_escritura),
+                      db_escritura: Session = Depends(get_db)):
+    region = repositorio.buscar_region(id_region)
 
     if region is not None and region.url is not None:
         imagen_url = url_imagen_region(id_region, region.url)
         if os.path.exists(imagen_url):
             return FileResponse(imagen_url, media_type="image/png")
-        else:
-            eliminar_url_region(region, db)
+        elif not repositorio.solo_lectura:
+            eliminar_url_region(id_region, repositorio_escritura, db_escritura)
 
     return imagen_por_defecto()
 
@@ -75,22 +71,23 @@ def get_region_imagen(id_region: int, db: Session = Depends(get_db)):
     path="/region",
     name="Obtener regiones y sus comunas",
     description="Obtiene todas las regiones, junto con todas sus comunas")
-def get_all_regiones_comunas(limit: int = 1000, offset: int = 0, db: Session = Depends(get_db)):
+async def get_all_regiones_comunas(limit: int = 1000, offset: int = 0,
+                                   repositorio: RepositorioCatalogo = Depends(get_repositorio)):
     respuesta = []
-    regiones = buscar_regiones(db, limit, offset)
+    regiones = await repositorio.buscar_regiones_async(limit, offset)
 
     if not regiones:
         return {"mensaje": "No hay regiones ni comunas disponibles"}
 
     for region in regiones:
-        comunas = buscar_comunas_de_region(region.idregion, db, None, None)
+        comunas = await repositorio.buscar_comunas_de_region_async(region.idregion, None, None)
         nombres_comunas: List[str] = []
         for comuna in comunas:
             nombres_comunas.append(comuna.nombre)
         respuesta.append({"region": region, "comunas": nombres_comunas})
 
     return {"mensaje": "Regiones y comunas obtenidas", "regiones": respuesta,
-            "total": count_regiones(db), "limit": limit, "offset": offset}
+            "total": await repositorio.count_regiones_async(), "limit": limit, "offset": offset}
 
 
 @router.post(
@@ -98,11 +95,12 @@ def get_all_regiones_comunas(limit: int = 1000, offset: int = 0, db: Session = D
     name="Guardar región",
     description="Guarda una región a través de un formulario")
 def save_region(idregion: int | None = Form(None), nombre: str = Form(...), active: int | None = Form(None),
-                imagen: UploadFile | None = File(None), db: Session = Depends(get_db)):
+                imagen: UploadFile | None = File(None), db: Session = Depends(get_db),
+                repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
     region_a_guardar = RegionTabla()
 
-    if nombre_de_region_es_repetido(nombre, db):
+    if repositorio.nombre_de_region_es_repetido(nombre):
         return respuesta_region_registrada(response)
     guardar_region(region_a_guardar, db, idregion, nombre, active, imagen)
 
@@ -115,9 +113,10 @@ def save_region(idregion: int | None = Form(None), nombre: str = Form(...), acti
     name="Guardar comunas de región",
     description="Guarda una lista de comunas para una región por su id")
 def save_comunas_de_region(id_region: int, request: str = Form(...), imagenes: List[UploadFile] | None = File(None),
-                           db: Session = Depends(get_db)):
+                           db: Session = Depends(get_db),
+                           repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
-    region = buscar_region(id_region, db)
+    region = repositorio.buscar_region(id_region)
     comunas_repetidas: List[str] = []
     comunas: List[str] = json.loads(request)
     contador_com: int = 0
@@ -125,7 +124,7 @@ def save_comunas_de_region(id_region: int, request: str = Form(...), imagenes: L
     if region is None:
         return respuesta_region_no_encontrada(response)
 
-    comunas_repetidas, contador_com = guardar_comunas_obtiene_repetidas(comunas, comunas_repetidas, db,
+    comunas_repetidas, contador_com = guardar_comunas_obtiene_repetidas(comunas, comunas_repetidas, db, repositorio,
                                                                         id_region, imagenes, contador_com)
     db.commit()
     return respuesta_save_comunas_de_region(comunas, comunas_repetidas)
@@ -136,7 +135,8 @@ def save_comunas_de_region(id_region: int, request: str = Form(...), imagenes: L
     name="Guardar regiones y sus comunas",
     description="Guarda una lista de regiones de un formulario, las cuales contienen listas de comunas")
 def save_all_regiones_comunas_form(request: str = Form(...), imagenes_reg: List[UploadFile] | None = File(None),
-                                   imagenes_com: List[UploadFile] | None = File(None), db: Session = Depends(get_db)):
+                                   imagenes_com: List[UploadFile] | None = File(None), db: Session = Depends(get_db),
+                                   repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     regiones_json = json.loads(request)
     regiones: List[RegionComunasResponse] = []
 
@@ -146,7 +146,7 @@ def save_all_regiones_comunas_form(request: str = Form(...), imagenes_reg: List[
         region.comunas = region_json["comunas"]
         regiones.append(region)
 
-    return save_all_regiones_comunas(regiones, imagenes_reg, imagenes_com, db)
+    return save_all_regiones_comunas(regiones, imagenes_reg, imagenes_com, db, repositorio)
 
 
 @router.post(
@@ -156,7 +156,8 @@ def save_all_regiones_comunas_form(request: str = Form(...), imagenes_reg: List[
 async def save_all_regiones_comunas_csv(request: UploadFile = File(...),
                                         imagenes_reg: List[UploadFile] | None = File(None),
                                         imagenes_com: List[UploadFile] | None = File(None),
-                                        db: Session = Depends(get_db)):
+                                        db: Session = Depends(get_db),
+                                        repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
 
     # se valida el archivo .csv y se convierte a un listado de registros
@@ -167,7 +168,7 @@ async def save_all_regiones_comunas_csv(request: UploadFile = File(...),
         return respuesta_archivo_invalido(response)
 
     regiones: List[RegionComunasResponse] = parse_csv_region_comunas_response(registros)
-    return save_all_regiones_comunas(regiones, imagenes_reg, imagenes_com, db)
+    return save_all_regiones_comunas(regiones, imagenes_reg, imagenes_com, db, repositorio)
 
 
 @router.put(
@@ -176,15 +177,15 @@ async def save_all_regiones_comunas_csv(request: UploadFile = File(...),
     description="Actualiza una región a través de un formulario")
 def put_region(id_region_path: int, idregion: int | None = Form(None), nombre: str | None = Form(None),
                active: int | None = Form(None), imagen: UploadFile | None = File(None),
-               db: Session = Depends(get_db)):
+               db: Session = Depends(get_db), repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
-    registro_a_actualizar = buscar_region(id_region_path, db)
+    registro_a_actualizar = repositorio.buscar_region(id_region_path)
 
     if registro_a_actualizar is None:
         return respuesta_region_no_encontrada(response)
     else:
         if nombre is not None:
-            if nombre_de_region_es_repetido(nombre, db):
+            if repositorio.nombre_de_region_es_repetido(nombre):
                 return respuesta_region_registrada(response)
         guardar_region(registro_a_actualizar, db, idregion, nombre, active, imagen)
 
@@ -196,9 +197,10 @@ def put_region(id_region_path: int, idregion: int | None = Form(None), nombre: s
     path="/region/{id_region}",
     name="Eliminar región",
     description="Elimina una región por su id")
-def delete_region(id_region: int, db: Session = Depends(get_db)):
+def delete_region(id_region: int, db: Session = Depends(get_db),
+                  repositorio: RepositorioCatalogo = Depends(get_repositorio_escritura)):
     response: DefaultResponse = DefaultResponse()
-    registro_a_eliminar = buscar_region(id_region, db)
+    registro_a_eliminar = repositorio.buscar_region(id_region)
 
     if registro_a_eliminar is None:
         return respuesta_region_no_encontrada(response)
@@ -229,16 +231,6 @@ def delete_all_regiones_comunas(db: Session = Depends(get_db)):
     return response
 
 
-def nombre_de_region_es_repetido(nombre_region: str, db: Session):
-    nombre_repetido = db.query(RegionTabla).filter(RegionTabla.nombre == nombre_region).first()
-    return nombre_repetido is not None
-
-
-def nombre_de_comuna_es_repetido(nombre_comuna: str, db: Session):
-    nombre_repetido = db.query(ComunaTabla).filter(ComunaTabla.nombre == nombre_comuna).first()
-    return nombre_repetido is not None
-
-
 def respuesta_region_registrada(response: DefaultResponse):
     response.respuesta = "error"
     response.mensaje = "Región ya ha sido registrada anteriormente"
@@ -277,32 +269,6 @@ def respuesta_save_comunas_de_region(comunas: List[str], comunas_repetidas: List
             "comunas_repetidas": comunas_repetidas_str}
 
 
-def buscar_region(id_region: int, db: Session):
-    return db.query(RegionTabla).filter(RegionTabla.idregion == id_region).first()
-
-
-def buscar_comunas_de_region(id_region: int, db: Session, _limit: int | None, _offset: int | None):
-    if _limit is None or _offset is None:
-        return db.query(ComunaTabla).filter(ComunaTabla.idregion == id_region).all()
-    else:
-        return db.query(ComunaTabla).filter(ComunaTabla.idregion == id_region).limit(_limit).offset(_offset).all()
-
-
-def buscar_regiones(db: Session, _limit: int | None, _offset: int | None):
-    if _limit is None or _offset is None:
-        return db.query(RegionTabla).all()
-    else:
-        return db.query(RegionTabla).limit(_limit).offset(_offset).all()
-
-
-def count_comunas_de_region(id_region: int, db: Session):
-    return db.query(ComunaTabla).filter(ComunaTabla.idregion == id_region).count()
-
-
-def count_regiones(db: Session):
-    return db.query(RegionTabla).count()
-
-
 def guardar_region(region: RegionTabla, db: Session, idregion: int | None, nombre: str | None, active: int | None,
                    imagen: UploadFile | None):
     if nombre is not None:
@@ -352,7 +318,7 @@ def guardar_region_obtiene_id(region: str, db: Session, imagen: UploadFile | Non
 
 
 def save_all_regiones_comunas(regiones: List[RegionComunasResponse], imagenes_reg: List[UploadFile] | None,
-                              imagenes_com: List[UploadFile] | None, db: Session):
+                              imagenes_com: List[UploadFile] | None, db: Session, repositorio: RepositorioCatalogo):
     comunas_repetidas: List[str] = []
     regiones_repetidas: List[str] = []
     contador_reg: int = -1
@@ -361,7 +327,7 @@ def save_all_regiones_comunas(regiones: List[RegionComunasResponse], imagenes_re
     for region_y_comunas in regiones:
         contador_reg += 1
 
-        if nombre_de_region_es_repetido(region_y_comunas.region, db):
+        if repositorio.nombre_de_region_es_repetido(region_y_comunas.region):
             regiones_repetidas.append(region_y_comunas.region)
             for comuna_repetida in region_y_comunas.comunas:
                 comunas_repetidas.append(comuna_repetida)
@@ -373,7 +339,7 @@ def save_all_regiones_comunas(regiones: List[RegionComunasResponse], imagenes_re
                 id_region = guardar_region_obtiene_id(region_y_comunas.region, db, None)
 
             comunas_repetidas, contador_com = guardar_comunas_obtiene_repetidas(region_y_comunas.comunas,
-                                                                                comunas_repetidas, db,
+                                                                                comunas_repetidas, db, repositorio,
                                                                                 id_region, imagenes_com, contador_com)
 
     db.commit()
@@ -381,9 +347,10 @@ def save_all_regiones_comunas(regiones: List[RegionComunasResponse], imagenes_re
 
 
 def guardar_comunas_obtiene_repetidas(comunas: List[str], comunas_repetidas: List[str], db: Session,
-                                      id_region: int, imagenes: List[UploadFile] | None, contador_com: int):
+                                      repositorio: RepositorioCatalogo, id_region: int,
+                                      imagenes: List[UploadFile] | None, contador_com: int):
     for comuna in comunas:
-        if nombre_de_comuna_es_repetido(comuna, db):
+        if repositorio.nombre_de_comuna_es_repetido(comuna):
             comunas_repetidas.append(comuna)
         else:
             try:
@@ -449,10 +416,11 @@ def subir_imagen_comuna(id_comuna: int, imagen: UploadFile):
     subir_imagen(ubicacion, imagen)
 
 
-def eliminar_url_region(region: RegionTabla, db: Session):
-    region.url = None
-    db.add(region)
-    db.commit()
+def eliminar_url_region(id_region: int, repositorio: RepositorioCatalogo, db: Session):
+    region = repositorio.buscar_region(id_region)
+    if region is not None:
+        region.url = None
+        db.commit()
 
 
 def obtener_extension(archivo: UploadFile):
@@ -0,0 +1,136 @@
+from abc import ABC, abstractmethod
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database.models import RegionTabla
+from database.models import ComunaTabla
+from database.singleflight import consultas_catalogo
+from models.request.comuna import ComunaResponse
+from models.request.region import RegionResponse
+
+# las sesiones marcadas así deben ver las escrituras del cliente, por lo que no se unen a consultas en vuelo
+# que pudieron empezar antes de su último commit
+LEE_SUS_ESCRITURAS = "lee_sus_escrituras"
+
+
+class RepositorioCatalogo(ABC):
+    solo_lectura: bool = False
+
+    @abstractmethod
+    def buscar_region(self, id_region: int):
+        pass
+
+    @abstractmethod
+    def buscar_comuna(self, id_comuna: int):
+        pass
+
+    @abstractmethod
+    def buscar_regiones(self, _limit: int | None, _offset: int | None):
+        pass
+
+    @abstractmethod
+    def buscar_comunas_de_region(self, id_region: int, _limit: int | None, _offset: int | None):
+        pass
+
+    @abstractmethod
+    def count_regiones(self):
+        pass
+
+    @abstractmethod
+    def count_comunas_de_region(self, id_region: int):
+        pass
+
+    # variantes para handlers async; por defecto corren la consulta en el threadpool
+    async def buscar_regiones_async(self, _limit: int | None, _offset: int | None):
+        return await run_in_threadpool(self.buscar_regiones, _limit, _offset)
+
+    async def buscar_comunas_de_region_async(self, id_region: int, _limit: int | None, _offset: int | None):
+        return await run_in_threadpool(self.buscar_comunas_de_region, id_region, _limit, _offset)
+
+    async def count_regiones_async(self):
+        return await run_in_threadpool(self.count_regiones)
+
+    @abstractmethod
+    def nombre_de_region_es_repetido(self, nombre_region: str):
+        pass
+
+    @abstractmethod
+    def nombre_de_comuna_es_repetido(self, nombre_comuna: str):
+        pass
+
+
+class RepositorioSQLAlchemy(RepositorioCatalogo):
+    def __init__(self, db: Session):
+        self.db = db
+
+    def buscar_region(self, id_region: int):
+        return self.db.query(RegionTabla).filter(RegionTabla.idregion == id_region).first()
+
+    def buscar_comuna(self, id_comuna: int):
+        return self.db.query(ComunaTabla).filter(ComunaTabla.idcomuna == id_comuna).first()
+
+    def buscar_regiones(self, _limit: int | None, _offset: int | None):
+        return self._coalescer(("buscar_regiones", self.db.get_bind(), _limit, _offset),
+                               self._buscar_regiones, _limit, _offset)
+
+    async def buscar_regiones_async(self, _limit: int | None, _offset: int | None):
+        return await self._coalescer_async(("buscar_regiones", self.db.get_bind(), _limit, _offset),
+                                           self._buscar_regiones, _limit, _offset)
+
+    def _buscar_regiones(self, _limit: int | None, _offset: int | None):
+        consulta = self.db.query(RegionTabla)
+        if _limit is not None and _offset is not None:
+            consulta = consulta.limit(_limit).offset(_offset)
+        # el resultado puede compartirse con otros hilos, así que no se publican instancias de la sesión
+        return [RegionResponse(idregion=region.idregion, nombre=region.nombre, active=region.active, url=region.url)
+                for region in consulta.all()]
+
+    def buscar_comunas_de_region(self, id_region: int, _limit: int | None, _offset: int | None):
+        return self._coalescer(("buscar_comunas_de_region", self.db.get_bind(), id_region, _limit, _offset),
+                               self._buscar_comunas_de_region, id_region, _limit, _offset)
+
+    async def buscar_comunas_de_region_async(self, id_region: int, _limit: int | None, _offset: int | None):
+        return await self._coalescer_async(("buscar_comunas_de_region", self.db.get_bind(), id_region, _limit, _offset),
+                                           self._buscar_comunas_de_region, id_region, _limit, _offset)
+
+    def _buscar_comunas_de_region(self, id_region: int, _limit: int | None, _offset: int | None):
+        consulta = self.db.query(ComunaTabla).filter(ComunaTabla.idregion == id_region)
+        if _limit is not None and _offset is not None:
+            consulta = consulta.limit(_limit).offset(_offset)
+        return [ComunaResponse(idcomuna=comuna.idcomuna, idregion=comuna.idregion, nombre=comuna.nombre,
+                               active=comuna.active, url=comuna.url)
+                for comuna in consulta.all()]
+
+    def count_regiones(self):
+        return self._coalescer(("count_regiones", self.db.get_bind()), self._count_regiones)
+
+    async def count_regiones_async(self):
+        return await self._coalescer_async(("count_regiones", self.db.get_bind()), self._count_regiones)
+
+    def _count_regiones(self):
+        return self.db.query(RegionTabla).count()
+
+    def count_comunas_de_region(self, id_region: int):
+        return self._coalescer(("count_comunas_de_region", self.db.get_bind(), id_region),
+                               self._count_comunas_de_region, id_region)
+
+    def _count_comunas_de_region(self, id_region: int):
+        return self.db.query(ComunaTabla).filter(ComunaTabla.idregion == id_region).count()
+
+    def nombre_de_region_es_repetido(self, nombre_region: str):
+        nombre_repetido = self.db.query(RegionTabla).filter(RegionTabla.nombre == nombre_region).first()
+        return nombre_repetido is not None
+
+    def nombre_de_comuna_es_repetido(self, nombre_comuna: str):
+        nombre_repetido = self.db.query(ComunaTabla).filter(ComunaTabla.nombre == nombre_comuna).first()
+        return nombre_repetido is not None
+
+    def _coalescer(self, clave: tuple, funcion, *args):
+        if self.db.info.get(LEE_SUS_ESCRITURAS):
+            return funcion(*args)
+        return consultas_catalogo.ejecutar(clave, funcion, *args)
+
+    # usa las mismas claves que _coalescer, así handlers sync y async comparten la consulta en vuelo
+    async def _coalescer_async(self, clave: tuple, funcion, *args):
+        if self.db.info.get(LEE_SUS_ESCRITURAS):
+            return await run_in_threadpool(funcion, *args)
+        return await consultas_catalogo.ejecutar_async(clave, funcion, *args)
@@ -0,0 +1,69 @@
+from database.repositorio import RepositorioCatalogo
+from database.snapshot import SnapshotCatalogo
+from models.request.comuna import ComunaResponse
+from models.request.region import RegionResponse
+
+
+# las filas se leen directamente del snapshot mapeado en memoria, compartido entre todos los workers
+class RepositorioMemoria(RepositorioCatalogo):
+    def __init__(self, snapshot: SnapshotCatalogo, solo_lectura: bool = True):
+        self.snapshot = snapshot
+        self.solo_lectura = solo_lectura
+
+    def buscar_region(self, id_region: int):
+        fila = self.snapshot.fila_region(id_region)
+        if fila is None:
+            return None
+        return self._region(fila)
+
+    def buscar_comuna(self, id_comuna: int):
+        fila = self.snapshot.fila_comuna(id_comuna)
+        if fila is None:
+            return None
+        return self._comuna(fila)
+
+    def buscar_regiones(self, _limit: int | None, _offset: int | None):
+        filas = paginar(range(self.snapshot.n_regiones), _limit, _offset)
+        return [self._region(fila) for fila in filas]
+
+    def buscar_comunas_de_region(self, id_region: int, _limit: int | None, _offset: int | None):
+        desde, hasta = self._rango_comunas(id_region)
+        filas = paginar(range(desde, hasta), _limit, _offset)
+        return [self._comuna(fila) for fila in filas]
+
+    def count_regiones(self):
+        return self.snapshot.n_regiones
+
+    def count_comunas_de_region(self, id_region: int):
+        desde, hasta = self._rango_comunas(id_region)
+        return hasta - desde
+
+    def nombre_de_region_es_repetido(self, nombre_region: str):
+        return nombre_region in self.snapshot.nombres_regiones
+
+    def nombre_de_comuna_es_repetido(self, nombre_comuna: str):
+        return nombre_comuna in self.snapshot.nombres_comunas
+
+    def _rango_comunas(self, id_region: int):
+        fila = self.snapshot.fila_region(id_region)
+        if fila is None:
+            return 0, 0
+        *_, desde, hasta = self.snapshot.region(fila)
+        return desde, hasta
+
+    def _region(self, fila: int):
+        idregion, active, nombre_inicio, nombre_largo, url_inicio, url_largo, *_ = self.snapshot.region(fila)
+        return RegionResponse(idregion=idregion, nombre=self.snapshot.string(nombre_inicio, nombre_largo),
+                              active=active, url=self.snapshot.string(url_inicio, url_largo))
+
+    def _comuna(self, fila: int):
+        idcomuna, idregion, active, nombre_inicio, nombre_largo, url_inicio, url_largo = self.snapshot.comuna(fila)
+        return ComunaResponse(idcomuna=idcomuna, idregion=idregion,
+                              nombre=self.snapshot.string(nombre_inicio, nombre_largo),
+                              active=active, url=self.snapshot.string(url_inicio, url_largo))
+
+
+def paginar(filas: range, _limit: int | None, _offset: int | None):
+    if _limit is None or _offset is None:
+        return filas
+    return filas[_offset:_offset + _limit]
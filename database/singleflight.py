@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+
+class _Llamada:
+    __slots__ = ("evento", "resultado", "error", "esperas_async")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado: Any = None
+        self.error: BaseException | None = None
+        self.esperas_async: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+# agrupa consultas idénticas en vuelo: la primera llamada con una clave ejecuta la función y
+# las que llegan mientras tanto (desde el threadpool o desde handlers async) reciben el mismo resultado
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_vuelo: Dict[Hashable, _Llamada] = {}
+        self.coalescidas: int = 0
+
+    def ejecutar(self, clave: Hashable, funcion: Callable, *args):
+        llamada, es_lider = self._unirse(clave)
+        if es_lider:
+            return self._ejecutar_lider(clave, llamada, funcion, *args)
+
+        llamada.evento.wait()
+        return self._resultado(llamada)
+
+    async def ejecutar_async(self, clave: Hashable, funcion: Callable, *args):
+        llamada, es_lider = self._unirse(clave)
+        if es_lider:
+            return await run_in_threadpool(self._ejecutar_lider, clave, llamada, funcion, *args)
+
+        # se espera sin ocupar un hilo del threadpool
+        with self._lock:
+            if not llamada.evento.is_set():
+                loop = asyncio.get_running_loop()
+                futuro = loop.create_future()
+                llamada.esperas_async.append((loop, futuro))
+            else:
+                futuro = None
+        if futuro is not None:
+            await futuro
+        return self._resultado(llamada)
+
+    def _unirse(self, clave: Hashable):
+        with self._lock:
+            llamada = self._en_vuelo.get(clave)
+            if llamada is not None:
+                self.coalescidas += 1
+                return llamada, False
+            llamada = _Llamada()
+            self._en_vuelo[clave] = llamada
+            return llamada, True
+
+    def _ejecutar_lider(self, clave: Hashable, llamada: _Llamada, funcion: Callable, *args):
+        try:
+            llamada.resultado = funcion(*args)
+        except BaseException as error:
+            llamada.error = error
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+                llamada.evento.set()
+                esperas_async = llamada.esperas_async
+            for loop, futuro in esperas_async:
+                loop.call_soon_threadsafe(_despertar, futuro)
+        return self._resultado(llamada)
+
+    @staticmethod
+    def _resultado(llamada: _Llamada):
+        if llamada.error is not None:
+            raise llamada.error
+        return llamada.resultado
+
+
+def _despertar(futuro: asyncio.Future):
+    if not futuro.done():
+        futuro.set_result(None)
+
+
+consultas_catalogo = SingleFlight()
@@ -0,0 +1,217 @@
+from sqlalchemy.orm import Session
+from database.models import RegionTabla
+from database.models import ComunaTabla
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Dict, List, Tuple
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# formato del snapshot (little endian):
+#   cabecera | tabla de regiones | tabla de comunas | índice de comunas por id | pool de strings utf-8
+# las regiones van ordenadas por id y las comunas por (idregion, idcomuna), así cada región guarda el rango
+# de filas de sus comunas; el índice guarda las filas de comunas ordenadas por idcomuna
+MAGIC = b"CRCH"
+FORMATO = 1
+# cabecera: magic, formato, generación, cantidad de regiones, cantidad de comunas, largo del pool, reservado
+CABECERA = struct.Struct("<4sIQIIII")
+# región: id, active, nombre (inicio, largo), url (inicio, largo o -1 si es nula), filas de sus comunas (desde, hasta)
+REGION = struct.Struct("<iiIIIiII")
+# comuna: id, idregion, active, nombre (inicio, largo), url (inicio, largo o -1 si es nula)
+COMUNA = struct.Struct("<iiiIIIi")
+FILA = struct.Struct("<I")
+
+
+class SnapshotInvalido(Exception):
+    pass
+
+
+class SnapshotCatalogo:
+    def __init__(self, ruta: str):
+        with open(ruta, "rb") as archivo:
+            stat = os.fstat(archivo.fileno())
+            if stat.st_size < CABECERA.size:
+                raise SnapshotInvalido(f"{ruta} no es un snapshot del catálogo")
+            self.identidad = identidad_archivo(stat)
+            self._mm = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, formato, self.generacion, self.n_regiones, self.n_comunas, largo_pool, _ = \
+            CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC or formato != FORMATO:
+            raise SnapshotInvalido(f"{ruta} no es un snapshot del catálogo")
+
+        self._inicio_regiones = CABECERA.size
+        self._inicio_comunas = self._inicio_regiones + self.n_regiones * REGION.size
+        self._inicio_indice = self._inicio_comunas + self.n_comunas * COMUNA.size
+        self._inicio_pool = self._inicio_indice + self.n_comunas * FILA.size
+        if len(self._mm) < self._inicio_pool + largo_pool:
+            raise SnapshotInvalido(f"{ruta} está incompleto")
+
+    def region(self, fila: int):
+        return REGION.unpack_from(self._mm, self._inicio_regiones + fila * REGION.size)
+
+    def comuna(self, fila: int):
+        return COMUNA.unpack_from(self._mm, self._inicio_comunas + fila * COMUNA.size)
+
+    def fila_region(self, id_region: int):
+        return self._bisectar(id_region, self.n_regiones, lambda fila: self.region(fila)[0])
+
+    def fila_comuna(self, id_comuna: int):
+        fila_indice = self._bisectar(id_comuna, self.n_comunas,
+                                     lambda fila: self.comuna(self._fila_indice(fila))[0])
+        if fila_indice is None:
+            return None
+        return self._fila_indice(fila_indice)
+
+    def string(self, inicio: int, largo: int):
+        if largo < 0:
+            return None
+        inicio += self._inicio_pool
+        return self._mm[inicio:inicio + largo].decode("utf-8")
+
+    # cada mapeo corresponde a una sola generación, así que los nombres se decodifican una vez
+    @cached_property
+    def nombres_regiones(self):
+        return frozenset(self.string(*self.region(fila)[2:4]) for fila in range(self.n_regiones))
+
+    @cached_property
+    def nombres_comunas(self):
+        return frozenset(self.string(*self.comuna(fila)[3:5]) for fila in range(self.n_comunas))
+
+    def _fila_indice(self, fila: int):
+        return FILA.unpack_from(self._mm, self._inicio_indice + fila * FILA.size)[0]
+
+    @staticmethod
+    def _bisectar(id_buscado: int, total: int, id_de_fila):
+        bajo, alto = 0, total
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if id_de_fila(medio) < id_buscado:
+                bajo = medio + 1
+            else:
+                alto = medio
+        if bajo < total and id_de_fila(bajo) == id_buscado:
+            return bajo
+        return None
+
+
+_snapshots: Dict[str, SnapshotCatalogo] = {}
+_lock_snapshots = threading.Lock()
+
+
+def obtener_snapshot(ruta: str):
+    # se vuelve a mapear el archivo sólo si fue reemplazado; las peticiones en curso conservan el mapeo anterior
+    try:
+        identidad = identidad_archivo(os.stat(ruta))
+    except FileNotFoundError:
+        # si el archivo desaparece se sigue sirviendo la última versión mapeada
+        with _lock_snapshots:
+            if ruta in _snapshots:
+                return _snapshots[ruta]
+        raise
+    with _lock_snapshots:
+        snapshot = _snapshots.get(ruta)
+        if snapshot is None or snapshot.identidad != identidad:
+            snapshot = SnapshotCatalogo(ruta)
+            _snapshots[ruta] = snapshot
+        return snapshot
+
+
+def identidad_archivo(stat: os.stat_result):
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def construir_snapshot(db: Session, ruta: str):
+    # el lock serializa las reconstrucciones entre workers, así la última en escribir leyó los datos más nuevos
+    with _lock_archivo(ruta):
+        regiones = db.query(RegionTabla).order_by(RegionTabla.idregion).all()
+        comunas = db.query(ComunaTabla).order_by(ComunaTabla.idregion, ComunaTabla.idcomuna).all()
+        contenido = compilar_snapshot(regiones, comunas, generacion_actual(ruta) + 1)
+        escribir_atomico(ruta, contenido)
+
+
+def compilar_snapshot(regiones: List[RegionTabla], comunas: List[ComunaTabla], generacion: int):
+    pool = bytearray()
+
+    def agregar_string(valor: str | None):
+        if valor is None:
+            return 0, -1
+        codificado = valor.encode("utf-8")
+        inicio = len(pool)
+        pool.extend(codificado)
+        return inicio, len(codificado)
+
+    rangos: Dict[int, Tuple[int, int]] = {}
+    tabla_comunas = bytearray()
+    for fila, comuna in enumerate(comunas):
+        desde, _ = rangos.get(comuna.idregion, (fila, fila))
+        rangos[comuna.idregion] = (desde, fila + 1)
+        tabla_comunas += COMUNA.pack(comuna.idcomuna, comuna.idregion, comuna.active,
+                                     *agregar_string(comuna.nombre), *agregar_string(comuna.url))
+
+    tabla_regiones = bytearray()
+    for region in regiones:
+        tabla_regiones += REGION.pack(region.idregion, region.active, *agregar_string(region.nombre),
+                                      *agregar_string(region.url), *rangos.get(region.idregion, (0, 0)))
+
+    indice = bytearray()
+    for fila in sorted(range(len(comunas)), key=lambda f: comunas[f].idcomuna):
+        indice += FILA.pack(fila)
+
+    cabecera = CABECERA.pack(MAGIC, FORMATO, generacion, len(regiones), len(comunas), len(pool), 0)
+    return bytes(cabecera + tabla_regiones + tabla_comunas + indice + pool)
+
+
+def generacion_actual(ruta: str):
+    try:
+        with open(ruta, "rb") as archivo:
+            magic, formato, generacion, *_ = CABECERA.unpack(archivo.read(CABECERA.size))
+    except (FileNotFoundError, struct.error):
+        return 0
+    if magic != MAGIC or formato != FORMATO:
+        return 0
+    return generacion
+
+
+def escribir_atomico(ruta: str, contenido: bytes):
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, prefix=".catalogo-")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(contenido)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.chmod(ruta_temporal, 0o644)
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+
+@contextmanager
+def _lock_archivo(ruta: str):
+    with open(f"{ruta}.lock", "a") as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+
+if __name__ == '__main__':
+    # uso: python -m database.snapshot catalogo.bin
+    from database.database import Session as SessionPrimaria
+
+    with SessionPrimaria() as sesion:
+        construir_snapshot(sesion, sys.argv[1])
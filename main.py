@@ -3,11 +3,21 @@ import uvicorn
 
 from api import comunas
 from api import regiones
+from database.singleflight import consultas_catalogo
 
 api = fastapi.FastAPI()
 
 api.include_router(comunas.router)
 api.include_router(regiones.router)
 
+
+@api.get(
+    path="/metricas",
+    name="Obtener métricas",
+    description="Obtiene la cantidad de consultas del catálogo que se resolvieron con una consulta ya en curso")
+def get_metricas():
+    return {"consultas_coalescidas": consultas_catalogo.coalescidas}
+
+
 if __name__ == '__main__':
     uvicorn.run("main:api", host="127.0.0.1", port=8000, reload=True)
@@ -6,7 +6,7 @@ class ComunaResponse(BaseModel):
     idregion: int = None
     nombre: str = None
     active: int = None
-    url: str = None
+    url: str | None = None
 
     class Config:
         orm_mode = True
@@ -6,7 +6,7 @@ class RegionResponse(BaseModel):
     idregion: int = None
     nombre: str = None
     active: int = None
-    url: str = None
+    url: str | None = None
 
 
 class RegionComunasResponse(BaseModel):
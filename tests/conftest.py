@@ -0,0 +1,6 @@
+import os
+import sys
+
+# los módulos leen su configuración al importarse; SQLite evita depender del driver de MySQL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import main
+from database import database
+from database.models import Base
+
+VENTANA = 0.5
+
+
+@pytest.fixture
+def bases(tmp_path, monkeypatch):
+    # dos archivos SQLite hacen de base primaria y de réplica
+    engine = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    engine_lectura = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(engine)
+    Base.metadata.create_all(engine_lectura)
+    monkeypatch.setattr(database, "Session", sessionmaker(engine))
+    monkeypatch.setattr(database, "SessionLectura", sessionmaker(engine_lectura))
+    monkeypatch.setattr(database, "VENTANA_LECTURA_PRIMARIA", VENTANA)
+    yield
+    engine.dispose()
+    engine_lectura.dispose()
+
+
+def guardar_region(cliente: TestClient):
+    respuesta = cliente.post("/region", data={"nombre": "maule"})
+    assert respuesta.json()["respuesta"] == "Región guardada"
+
+
+def test_cliente_lee_su_escritura_desde_primaria(bases):
+    cliente = TestClient(main.api)
+    guardar_region(cliente)
+
+    respuesta = cliente.get("/region").json()
+    assert [r["region"]["nombre"] for r in respuesta["regiones"]] == ["Maule"]
+
+
+def test_tras_la_ventana_lee_desde_replica(bases):
+    cliente = TestClient(main.api)
+    guardar_region(cliente)
+    time.sleep(VENTANA + 0.1)
+
+    respuesta = cliente.get("/region").json()
+    assert respuesta == {"mensaje": "No hay regiones ni comunas disponibles"}
+
+
+def test_cliente_sin_escrituras_lee_desde_replica(bases):
+    guardar_region(TestClient(main.api))
+
+    respuesta = TestClient(main.api).get("/region").json()
+    assert respuesta == {"mensaje": "No hay regiones ni comunas disponibles"}
+
+
+@pytest.mark.parametrize("marca", [lambda: str(time.time() + VENTANA / 2),
+                                   lambda: f"{time.time() + VENTANA / 2}:{'0' * 64}"])
+def test_marca_sin_firma_valida_lee_desde_replica(bases, marca):
+    guardar_region(TestClient(main.api))
+
+    cliente = TestClient(main.api)
+    cliente.cookies.set(database.COOKIE_LECTURA_PRIMARIA, marca())
+    respuesta = cliente.get("/region").json()
+    assert respuesta == {"mensaje": "No hay regiones ni comunas disponibles"}
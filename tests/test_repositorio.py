@@ -0,0 +1,103 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import main
+from database import database
+from database.models import Base, ComunaTabla, RegionTabla
+from database.repositorio_memoria import RepositorioMemoria
+from database.snapshot import construir_snapshot, obtener_snapshot
+
+RUTAS = ["/region", "/region?limit=1&offset=1", "/region/1", "/region/2", "/region/99", "/region/1/comuna",
+         "/region/1/comuna?limit=2&offset=1", "/region/99/comuna", "/comuna/2", "/comuna/4", "/comuna/99"]
+
+
+@pytest.fixture
+def catalogo(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalogo.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(engine)
+    with Session() as db:
+        db.add_all([RegionTabla(idregion=1, nombre="Maule"),
+                    RegionTabla(idregion=2, nombre="Biobío", url="png"),
+                    ComunaTabla(idcomuna=1, idregion=1, nombre="Talca"),
+                    ComunaTabla(idcomuna=2, idregion=1, nombre="Curicó", url="jpg"),
+                    ComunaTabla(idcomuna=3, idregion=1, nombre="Linares", active=0),
+                    ComunaTabla(idcomuna=4, idregion=2, nombre="Concepción")])
+        db.commit()
+        ruta_snapshot = str(tmp_path / "catalogo.bin")
+        construir_snapshot(db, ruta_snapshot)
+    monkeypatch.setattr(database, "SessionLectura", Session)
+    monkeypatch.setattr(database, "CATALOGO_SNAPSHOT", ruta_snapshot)
+    yield monkeypatch
+    engine.dispose()
+
+
+@pytest.fixture
+def memoria(catalogo):
+    # como al iniciar con CATALOGO_BACKEND=memoria, no hay base de datos
+    catalogo.setattr(database, "CATALOGO_BACKEND", "memoria")
+    catalogo.setattr(database, "engine", None)
+    return TestClient(main.api)
+
+
+def test_comuna_incluye_nombre_de_region(memoria):
+    respuesta = memoria.get("/comuna/2").json()
+
+    assert respuesta == {"mensaje": "Comuna obtenida",
+                         "comuna": {"idcomuna": 2, "idregion": 1, "nombre": "Curicó", "active": 1, "url": "jpg",
+                                    "region": "Maule"}}
+
+
+def test_comunas_de_region_paginadas(memoria):
+    respuesta = memoria.get("/region/1/comuna", params={"limit": 2, "offset": 1}).json()
+
+    assert [comuna["nombre"] for comuna in respuesta["comunas"]] == ["Curicó", "Linares"]
+    assert (respuesta["total"], respuesta["limit"], respuesta["offset"]) == (3, 2, 1)
+    assert memoria.get("/region/99/comuna").json()["mensaje"] == "Región no encontrada"
+
+
+def test_url_nula(memoria):
+    assert memoria.get("/region/1").json()["region"]["url"] is None
+    assert memoria.get("/region/2").json()["region"]["url"] == "png"
+    assert memoria.get("/comuna/1").json()["comuna"]["url"] is None
+
+
+def test_marca_de_lectura_primaria_se_ignora_sin_base(memoria):
+    expira = str(time.time() + 60)
+    memoria.cookies.set(database.COOKIE_LECTURA_PRIMARIA, f"{expira}:{database.firmar(expira)}")
+    respuesta = memoria.get("/region/1")
+
+    assert respuesta.status_code == 200
+    assert respuesta.json()["region"]["nombre"] == "Maule"
+
+
+@pytest.mark.parametrize("metodo, ruta", [("post", "/region"), ("put", "/region/1"), ("delete", "/region/1"),
+                                          ("delete", "/comuna/1"), ("delete", "/region")])
+def test_escrituras_no_permitidas(memoria, metodo, ruta):
+    respuesta = memoria.request(metodo, ruta, data={"nombre": "ñuble"} if metodo != "delete" else None)
+
+    assert respuesta.status_code == 405
+    assert respuesta.headers["allow"] == "GET"
+
+
+def test_nombres_repetidos(memoria):
+    repositorio = RepositorioMemoria(obtener_snapshot(database.CATALOGO_SNAPSHOT))
+
+    assert repositorio.nombre_de_region_es_repetido("Biobío")
+    assert not repositorio.nombre_de_region_es_repetido("Ñuble")
+    assert repositorio.nombre_de_comuna_es_repetido("Concepción")
+    assert not repositorio.nombre_de_comuna_es_repetido("Maule")
+
+
+def test_repositorios_responden_lo_mismo(catalogo):
+    cliente = TestClient(main.api)
+    catalogo.setattr(database, "CATALOGO_BACKEND", "sqlalchemy")
+    desde_base = [cliente.get(ruta).json() for ruta in RUTAS]
+    catalogo.setattr(database, "CATALOGO_BACKEND", "memoria")
+    desde_snapshot = [cliente.get(ruta).json() for ruta in RUTAS]
+
+    assert desde_snapshot == desde_base
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import database, repositorio
+from database.models import Base, RegionTabla
+from database.repositorio import LEE_SUS_ESCRITURAS, RepositorioSQLAlchemy
+from database.singleflight import SingleFlight, consultas_catalogo
+import main
+
+SEGUIDORES = 5
+
+
+def esperar_coalescidas(singleflight: SingleFlight, cantidad: int):
+    limite = time.monotonic() + 5
+    while singleflight.coalescidas < cantidad and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+def esperar_en_vuelo(singleflight: SingleFlight, clave):
+    limite = time.monotonic() + 5
+    while clave not in singleflight._en_vuelo and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert clave in singleflight._en_vuelo
+
+
+def coalescer_en_hilos(singleflight: SingleFlight, consulta, seguidores: int):
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(singleflight.ejecutar("regiones", consulta)))
+             for _ in range(seguidores + 1)]
+    for hilo in hilos:
+        hilo.start()
+
+    esperar_coalescidas(singleflight, seguidores)
+    consulta.liberar.set()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+class ConsultaLenta:
+    def __init__(self, resultado):
+        self.resultado = resultado
+        self.ejecuciones = 0
+        self.liberar = threading.Event()
+
+    def __call__(self):
+        self.ejecuciones += 1
+        self.liberar.wait(5)
+        return self.resultado
+
+
+def test_sesion_que_lee_sus_escrituras_no_se_une_a_consulta_en_vuelo(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalogo.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(engine)
+    with Session() as db:
+        db.add(RegionTabla(nombre="Maule"))
+        db.commit()
+
+    # una consulta que empezó antes del commit sigue en vuelo con la misma clave
+    liberar = threading.Event()
+    clave = ("buscar_regiones", engine, None, None)
+    lider = threading.Thread(target=consultas_catalogo.ejecutar, args=(clave, liberar.wait, 5))
+    lider.start()
+    try:
+        esperar_en_vuelo(consultas_catalogo, clave)
+        with Session(info={LEE_SUS_ESCRITURAS: True}) as db:
+            regiones = RepositorioSQLAlchemy(db).buscar_regiones(None, None)
+        assert [region.nombre for region in regiones] == ["Maule"]
+    finally:
+        liberar.set()
+        lider.join()
+        engine.dispose()
+
+
+def test_peticiones_concurrentes_comparten_una_consulta_a_la_base(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalogo.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(engine)
+    with Session() as db:
+        db.add(RegionTabla(nombre="Maule"))
+        db.commit()
+    singleflight = SingleFlight()
+    monkeypatch.setattr(repositorio, "consultas_catalogo", singleflight)
+    monkeypatch.setattr(database, "CATALOGO_BACKEND", "sqlalchemy")
+    monkeypatch.setattr(database, "SessionLectura", Session)
+
+    consultas_regiones = []
+
+    def contar_consulta(_conexion, _cursor, sentencia, *_):
+        if sentencia.startswith("SELECT regiones."):
+            consultas_regiones.append(sentencia)
+            # la consulta sigue en curso hasta que llegan las demás peticiones
+            esperar_coalescidas(singleflight, SEGUIDORES)
+
+    event.listen(engine, "before_cursor_execute", contar_consulta)
+    respuestas = []
+    hilos = [threading.Thread(target=lambda: respuestas.append(TestClient(main.api).get("/region").json()))
+             for _ in range(SEGUIDORES + 1)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    engine.dispose()
+
+    assert len(consultas_regiones) == 1
+    assert singleflight.coalescidas >= SEGUIDORES
+    assert [[r["region"]["nombre"] for r in respuesta["regiones"]] for respuesta in respuestas] == \
+        [["Maule"]] * (SEGUIDORES + 1)
+
+
+def test_hilos_comparten_una_ejecucion():
+    singleflight = SingleFlight()
+    consulta = ConsultaLenta(["Maule"])
+    resultados = coalescer_en_hilos(singleflight, consulta, SEGUIDORES)
+
+    assert consulta.ejecuciones == 1
+    assert singleflight.coalescidas == SEGUIDORES
+    assert resultados == [["Maule"]] * (SEGUIDORES + 1)
+
+
+def test_corrutinas_e_hilos_comparten_una_ejecucion():
+    singleflight = SingleFlight()
+    consulta = ConsultaLenta(["Maule"])
+    resultados = []
+
+    async def consultar():
+        lider = asyncio.create_task(singleflight.ejecutar_async("regiones", consulta))
+        await asyncio.sleep(0.05)
+        seguidores = [asyncio.create_task(singleflight.ejecutar_async("regiones", consulta))
+                      for _ in range(SEGUIDORES)]
+        hilo = threading.Thread(target=lambda: resultados.append(singleflight.ejecutar("regiones", consulta)))
+        hilo.start()
+        # el lazo de eventos sigue libre mientras la consulta está en curso
+        await asyncio.get_running_loop().run_in_executor(None, esperar_coalescidas, singleflight, SEGUIDORES + 1)
+        consulta.liberar.set()
+        resultados.extend(await asyncio.gather(lider, *seguidores))
+        await asyncio.get_running_loop().run_in_executor(None, hilo.join)
+
+    asyncio.run(consultar())
+
+    assert consulta.ejecuciones == 1
+    assert singleflight.coalescidas == SEGUIDORES + 1
+    assert resultados == [["Maule"]] * (SEGUIDORES + 2)
+
+
+def test_error_del_lider_llega_a_los_seguidores():
+    singleflight = SingleFlight()
+    liberar = threading.Event()
+    errores = []
+
+    def consulta_fallida():
+        liberar.wait(5)
+        raise RuntimeError("sin conexión")
+
+    def consultar():
+        try:
+            singleflight.ejecutar("regiones", consulta_fallida)
+        except RuntimeError as error:
+            errores.append(str(error))
+
+    hilos = [threading.Thread(target=consultar) for _ in range(SEGUIDORES + 1)]
+    for hilo in hilos:
+        hilo.start()
+    esperar_coalescidas(singleflight, SEGUIDORES)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == ["sin conexión"] * (SEGUIDORES + 1)
+
+
+def test_metricas_expone_consultas_coalescidas(monkeypatch):
+    singleflight = SingleFlight()
+    monkeypatch.setattr(main, "consultas_catalogo", singleflight)
+    coalescer_en_hilos(singleflight, ConsultaLenta(["Maule"]), SEGUIDORES)
+
+    respuesta = TestClient(main.api).get("/metricas").json()
+    assert respuesta == {"consultas_coalescidas": SEGUIDORES}
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import main
+from database import database
+from database.models import Base
+from database.snapshot import obtener_snapshot
+
+
+@pytest.fixture
+def catalogo(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalogo.db'}")
+    Base.metadata.create_all(engine)
+    ruta_snapshot = str(tmp_path / "catalogo.bin")
+    # se cambia el bind de la sesión primaria para conservar sus eventos
+    monkeypatch.setitem(database.Session.kw, "bind", engine)
+    monkeypatch.setattr(database, "SessionLectura", database.Session)
+    monkeypatch.setattr(database, "CATALOGO_BACKEND", "snapshot")
+    monkeypatch.setattr(database, "CATALOGO_SNAPSHOT", ruta_snapshot)
+    monkeypatch.setattr(database, "_snapshot_pendiente", threading.Event())
+    yield ruta_snapshot
+    engine.dispose()
+
+
+def nombres_de_regiones(cliente: TestClient):
+    respuesta = cliente.get("/region").json()
+    return [region["region"]["nombre"] for region in respuesta.get("regiones", [])]
+
+
+def test_escritura_reconstruye_el_snapshot(catalogo):
+    assert nombres_de_regiones(TestClient(main.api)) == []
+    generacion = obtener_snapshot(catalogo).generacion
+
+    TestClient(main.api).post("/region", data={"nombre": "maule"})
+
+    assert obtener_snapshot(catalogo).generacion == generacion + 1
+    assert nombres_de_regiones(TestClient(main.api)) == ["Maule"]
+
+
+def test_borrado_masivo_reconstruye_el_snapshot(catalogo):
+    TestClient(main.api).post("/region", data={"nombre": "maule"})
+    generacion = obtener_snapshot(catalogo).generacion
+
+    respuesta = TestClient(main.api).delete("/region")
+
+    assert respuesta.status_code == 200
+    assert obtener_snapshot(catalogo).generacion == generacion + 1
+    assert nombres_de_regiones(TestClient(main.api)) == []
+
+
+def test_fallo_al_reconstruir_no_afecta_la_escritura(catalogo, monkeypatch):
+    assert nombres_de_regiones(TestClient(main.api)) == []
+
+    def construir_snapshot_fallido(db, ruta):
+        raise OSError("disco lleno")
+
+    with monkeypatch.context() as contexto:
+        contexto.setattr(database, "construir_snapshot", construir_snapshot_fallido)
+        respuesta = TestClient(main.api).post("/region", data={"nombre": "maule"})
+
+    assert respuesta.status_code == 200
+    assert respuesta.json()["respuesta"] == "Región guardada"
+    assert nombres_de_regiones(TestClient(main.api)) == []
+
+    # la siguiente escritura vuelve a intentar la reconstrucción
+    TestClient(main.api).post("/region", data={"nombre": "biobio"})
+    assert nombres_de_regiones(TestClient(main.api)) == ["Maule", "Biobio"]
+
+
+def test_modo_memoria_sin_snapshot_falla_al_iniciar(tmp_path):
+    entorno = {**os.environ, "CATALOGO_BACKEND": "memoria", "CATALOGO_SNAPSHOT": str(tmp_path / "no_existe.bin")}
+    proceso = subprocess.run([sys.executable, "-c", "import main"], env=entorno, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    assert proceso.returncode != 0
+    assert "CATALOGO_BACKEND=memoria requiere un snapshot válido" in proceso.stderr